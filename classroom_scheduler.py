@@ -1,5 +1,9 @@
-from typing import List, Dict, Tuple
-from dataclasses import dataclass
+import hashlib
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Tuple, Optional
+from dataclasses import dataclass, field
 from enum import Enum
 import numpy as np
 import pandas as pd
@@ -9,7 +13,7 @@ class RoomType(Enum):
     LAB = 'lab'
     CLASSROOM = 'sala'
 
-@dataclass
+@dataclass(slots=True)
 class Course:
     name: str
     course_code: str
@@ -19,15 +23,13 @@ class Course:
     requires_lab: bool
     preferred_floor: int
     floor_preference_weight: float = 1.0
-    time_slots: List[int] = None
+    time_slots: int = 0
     split_authorized: bool = False
-    assigned_professors: List[str] = None
+    assigned_professors: List[str] = field(default_factory=list)
     is_split: bool = False
 
     def __post_init__(self):
         self.time_slots = TimeSlotManager.create_time_slots(self.day, self.time)
-        if self.assigned_professors is None:
-            self.assigned_professors = []
 
     def can_be_split(self) -> bool:
         """Check if the course meets all criteria for splitting"""
@@ -37,17 +39,13 @@ class Course:
             len(self.assigned_professors) >= 2
         )
 
-@dataclass
+@dataclass(slots=True)
 class Room:
     name: str
     room_type: RoomType
     capacity: int
     floor: int
     is_blocked: bool = False
-    floor_matches: Dict[str, int] = None
-
-    def __post_init__(self):
-        self.floor_matches = {}
 
 class TimeSlotManager:
     DAY_TO_BASE_INDEX = {
@@ -60,9 +58,12 @@ class TimeSlotManager:
         "20h50": 4, "21h40": 5, "22h30": 6
     }
 
+    NUM_SLOTS = 48
+    ALL_SLOTS_MASK = (1 << NUM_SLOTS) - 1
+
     @classmethod
-    def create_time_slots(cls, day: str, time_range: str) -> List[int]:
-        time_slots = [0] * 48
+    def create_time_slots(cls, day: str, time_range: str) -> int:
+        """Return the occupied slots as a bitmask (bit i set = slot i in use)."""
         start_time, end_time = time_range.split('-')
 
         base_idx = cls.DAY_TO_BASE_INDEX.get(day, 0)
@@ -70,37 +71,77 @@ class TimeSlotManager:
 
         slots_needed = 4 if time_range == "19h00-22h30" else 2
 
-        for i in range(start_idx, start_idx + slots_needed):
-            if i < len(time_slots):
-                time_slots[i] = 1
-  
-        return time_slots
+        return (((1 << slots_needed) - 1) << start_idx) & cls.ALL_SLOTS_MASK
 
     @staticmethod
-    def has_conflict(slots1: List[int], slots2: List[int]) -> bool:
-        return any(s1 and s2 for s1, s2 in zip(slots1, slots2))
+    def has_conflict(slots1: int, slots2: int) -> bool:
+        return bool(slots1 & slots2)
+
+    @classmethod
+    def courses_by_slot(cls, courses: List['Course']) -> List[List[int]]:
+        """Return, for each slot, the indices of the courses that occupy it."""
+        masks = np.array([course.time_slots for course in courses], dtype=np.uint64)
+        shifts = np.arange(cls.NUM_SLOTS, dtype=np.uint64)
+        occupied = (masks[:, None] >> shifts[None, :]) & np.uint64(1)
+        return [np.flatnonzero(occupied[:, h]).tolist() for h in range(cls.NUM_SLOTS)]
 
 class DataLoader:
+    COURSE_COLUMNS = [
+        'name', 'course', 'day', 'time', 'class_size', 'req', 'pref_floor',
+        'course_floor_pref', 'split_authorized', 'assigned_professors'
+    ]
+    COURSE_DTYPES = {
+        'class_size': np.int32, 'pref_floor': np.int8, 'req': np.int8,
+        'course_floor_pref': np.float32
+    }
+    COURSE_DEFAULTS = {
+        'course_floor_pref': 1, 'split_authorized': False, 'assigned_professors': ''
+    }
+    ROOM_COLUMNS = ['name', 'type', 'capacity', 'floor', 'is_blocked']
+    ROOM_DTYPES = {'capacity': np.int32, 'floor': np.int8}
+    ROOM_DEFAULTS = {'is_blocked': False}
+
     @staticmethod
     def load_data(courses_file: str, rooms_file: str) -> Tuple[List[Course], List[Room]]:
-        courses_df = pd.read_csv(courses_file)
-        rooms_df = pd.read_csv(rooms_file)
+        courses_df = pd.read_csv(courses_file, dtype=DataLoader.COURSE_DTYPES, engine='c')
+        rooms_df = pd.read_csv(rooms_file, dtype=DataLoader.ROOM_DTYPES, engine='c')
+
+        # Optional columns may be missing or empty; fill in their defaults.
+        # Required columns are selected as-is, so a missing one raises KeyError.
+        courses_df = courses_df.assign(**{
+            column: default for column, default in DataLoader.COURSE_DEFAULTS.items()
+            if column not in courses_df
+        })[DataLoader.COURSE_COLUMNS]
+        courses_df = courses_df.fillna(DataLoader.COURSE_DEFAULTS)
+        courses_df['split_authorized'] = courses_df['split_authorized'].astype(bool)
+        courses_df['assigned_professors'] = (
+            courses_df['assigned_professors'].astype(str).str.split(',')
+        )
+
+        rooms_df = rooms_df.assign(**{
+            column: default for column, default in DataLoader.ROOM_DEFAULTS.items()
+            if column not in rooms_df
+        })[DataLoader.ROOM_COLUMNS]
+        rooms_df = rooms_df.fillna(DataLoader.ROOM_DEFAULTS)
+        rooms_df['type'] = rooms_df['type'].str.lower()
+        rooms_df['is_blocked'] = rooms_df['is_blocked'].astype(bool)
 
         courses = []
-        for _, row in courses_df.iterrows():
-            professors = row.get('assigned_professors', '').split(',') if pd.notna(row.get('assigned_professors')) else []
-            professors = [p.strip() for p in professors if p.strip()]
+        for (name, course_code, day, time, class_size, req, pref_floor,
+             course_floor_pref, split_authorized, assigned_professors) \
+                in courses_df.itertuples(index=False, name=None):
+            professors = [p.strip() for p in assigned_professors if p.strip()]
 
             course = Course(
-                name=row['name'],
-                course_code=row['course'],
-                day=row['day'],
-                time=row['time'],
-                class_size=row['class_size'],
-                requires_lab=row['req'] == 1,
-                preferred_floor=row['pref_floor'],
-                floor_preference_weight=row.get('course_floor_pref', 1),
-                split_authorized=row.get('split_authorized', False),
+                name=name,
+                course_code=course_code,
+                day=day,
+                time=time,
+                class_size=class_size,
+                requires_lab=req == 1,
+                preferred_floor=pref_floor,
+                floor_preference_weight=course_floor_pref,
+                split_authorized=split_authorized,
                 assigned_professors=professors
             )
 
@@ -139,21 +180,52 @@ class DataLoader:
 
         rooms = [
             Room(
-                name=row['name'],
-                room_type=RoomType(row['type'].lower()),
-                capacity=row['capacity'],
-                floor=row['floor'],
-                is_blocked=row.get('is_blocked', False)
+                name=name,
+                room_type=RoomType(room_type),
+                capacity=capacity,
+                floor=floor,
+                is_blocked=is_blocked
             )
-            for _, row in rooms_df.iterrows()
+            for name, room_type, capacity, floor, is_blocked
+            in rooms_df.itertuples(index=False, name=None)
         ]
-        
+
         return courses, rooms
 
+class WarmStartHiGHS(HiGHS):
+    """
+    PuLP's in-memory HiGHS interface, extended to hand the variables' current
+    values to HiGHS as a MIP start (PuLP's HiGHS class ignores them).
+    """
+    def callSolver(self, lp):
+        variables = lp.variables()
+        if any(var.varValue is not None for var in variables):
+            import highspy  # only reached when HiGHS is available
+
+            col_value = [0.0] * len(variables)
+            for var in variables:
+                col_value[var.index] = var.varValue or 0.0
+            solution = highspy.HighsSolution()
+            solution.col_value = col_value
+            lp.solverModel.setSolution(solution)
+
+        super().callSolver(lp)
+
 class ScheduleOptimizer:
-    def __init__(self, courses: List[Course], rooms: List[Room]):
+    def __init__(self, courses: List[Course], rooms: List[Room],
+                 solver: Optional[LpSolver] = None,
+                 time_limit: Optional[float] = None,
+                 gap_rel: Optional[float] = None):
         self.courses = courses
+        # The model works on the courses in restrictiveness order; _order[d] is
+        # the index in self.courses of the course at model position d
+        self._model_courses = []
+        self._order = []
         self.rooms = rooms
+        self.solver = solver or self._default_solver(time_limit, gap_rel)
+        self._custom_solver = solver is not None
+        self.time_limit = time_limit
+        self.gap_rel = gap_rel
         self.weights = {
             'floor_pref': 10,
             'lab_usage': 5,
@@ -162,25 +234,132 @@ class ScheduleOptimizer:
             'capacity_penalty': 15
         }
         self.model = None
+        self._model_key = None
         self.variables = {}
+        self.feasible_by_d = []
+        self.feasible_by_r = []
+        self.floor_match = None
+        self.floor_dist = None
+        self.cap_violation_const = None
+        self._order_courses_by_restrictiveness()
         self._calculate_floor_matches()
 
+    @staticmethod
+    def _default_solver(time_limit: Optional[float] = None,
+                        gap_rel: Optional[float] = None,
+                        threads: Optional[int] = None) -> LpSolver:
+        """
+        Prefer HiGHS through its in-memory Python API (no model file round-trip),
+        then the HiGHS binary, then PuLP's bundled CBC; by default all cores.
+        All three take the current variable values as a MIP start.
+        """
+        options = dict(msg=False, threads=threads or os.cpu_count(),
+                       timeLimit=time_limit, gapRel=gap_rel)
+        highs = WarmStartHiGHS(**options)
+        if highs.available():
+            return highs
+
+        highs_cmd = HiGHS_CMD(warmStart=True, **options)
+        if highs_cmd.available():
+            return highs_cmd
+        return PULP_CBC_CMD(warmStart=True, **options)
+
     def _calculate_floor_matches(self):
-        for room in self.rooms:
-            for course in self.courses:
-                if course.preferred_floor <= 0:
-                    room.floor_matches[course.name] = 1
-                else:
-                    room.floor_matches[course.name] = 1 if room.floor == course.preferred_floor else 0
+        """
+        Precompute the (course, room) floor and capacity parameters as 2D arrays
+        indexed by [d, r].
+        """
+        pref = np.array([course.preferred_floor for course in self._model_courses], dtype=np.int32)
+        class_size = np.array([course.class_size for course in self._model_courses], dtype=np.int32)
+        floor = np.array([room.floor for room in self.rooms], dtype=np.int32)
+        capacity = np.array([room.capacity for room in self.rooms], dtype=np.int32)
+
+        # Courses without a preferred floor (<= 0) match every room
+        self.floor_match = np.where(
+            pref[:, None] <= 0, 1, pref[:, None] == floor[None, :]
+        ).astype(np.int8)
+        self.floor_dist = np.abs(pref[:, None] - floor[None, :])
+        self.cap_violation_const = np.maximum(0, class_size[:, None] - capacity[None, :])
+
+    def _solver_uses_start(self) -> bool:
+        """Whether the solver reads the variables' initial values as a MIP start."""
+        return (isinstance(self.solver, WarmStartHiGHS) or
+                getattr(self.solver, 'optionsDict', {}).get('warmStart', False))
+
+    def _input_key(self) -> str:
+        """Hash of everything the model is built from (courses, rooms, weights)."""
+        inputs = repr((self.courses, self.rooms, sorted(self.weights.items())))
+        return hashlib.blake2b(inputs.encode()).hexdigest()
 
     def optimize(self) -> pd.DataFrame:
-        self.model = self._create_model()
-        status = self.model.solve()
+        # Rebuild only when the inputs changed since the last build. Otherwise the
+        # previous solution stays in the variables, and solvers that accept a MIP
+        # start (see _solver_uses_start) begin from it.
+        if self.model is None or self._input_key() != self._model_key:
+            self._order_courses_by_restrictiveness()
+            self._calculate_floor_matches()
+            self.model = self._create_model()
+            self._model_key = self._input_key()
+            if self._solver_uses_start():
+                self._set_greedy_start()
+
+        status = self.model.solve(self.solver)
 
         if status == LpStatusOptimal:
             return self._format_results()
         return pd.DataFrame()
 
+    def optimize_many(self, weight_variants: List[Dict[str, int]]) -> List[pd.DataFrame]:
+        """
+        Solve one independent scenario per weight variant (each overriding
+        self.weights) in parallel worker processes, one single-threaded solve
+        per process. Results are returned in the order of weight_variants, and
+        the rows of each DataFrame follow the caller's course order, as in
+        optimize().
+        """
+        if not weight_variants:
+            return []
+
+        scenarios = [{**self.weights, **weights} for weights in weight_variants]
+        for weights in scenarios:
+            self._check_weights(weights)
+
+        solver = self.solver if self._custom_solver else None
+        max_workers = min(os.cpu_count() or 1, len(weight_variants))
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(
+                    _optimize_scenario, self.courses, self.rooms,
+                    weights, solver, self.time_limit, self.gap_rel
+                )
+                for weights in scenarios
+            ]
+            return [future.result() for future in futures]
+
+    @staticmethod
+    def _check_weights(weights: Dict[str, int]):
+        """
+        Objective weights must be integers so every objective coefficient is an
+        integer; fractional weights are rejected rather than rounded.
+        """
+        for name, weight in weights.items():
+            if weight != int(weight):
+                raise ValueError(f"Weight '{name}' must be an integer, got {weight!r}")
+
+    def update_weights(self, weights: Dict[str, int]):
+        """
+        Change objective weights. If the model is already built for the current
+        courses and rooms, only its objective is replaced.
+        """
+        self._check_weights(weights)
+        model_is_current = self.model is not None and self._input_key() == self._model_key
+        self.weights.update(weights)
+
+        if model_is_current:
+            self.model.setObjective(self._create_objective_function())
+            self._model_key = self._input_key()
+
     def _create_model(self) -> LpProblem:
         model = LpProblem("Classroom_Assignment", LpMinimize)
 
@@ -194,41 +373,67 @@ class ScheduleOptimizer:
 
         return model
 
-    def _create_decision_variables(self) -> Dict:
-        """Create and return all decision variables for the optimization model."""
-        variables = {}
+    def _calculate_feasible_pairs(self) -> List[Tuple[int, int]]:
+        """
+        Return the (course, room) pairs that may be assigned at all: the room is
+        not blocked and the class fits within 120% of its capacity. Room type is
+        a soft preference and is handled by the objective instead.
+        """
+        courses = self._model_courses
+        rooms = self.rooms
+        open_rooms = [r for r, room in enumerate(rooms) if not room.is_blocked]
+
+        feasible = [
+            (d, r)
+            for d in range(len(courses))
+            for r in open_rooms
+            if courses[d].class_size <= rooms[r].capacity * 1.2
+        ]
 
-        variables['x'] = LpVariable.dicts(
-            "assign",
-            ((d, r) for d in range(len(self.courses)) for r in range(len(self.rooms))),
-            cat='Binary'
-        )
+        self.feasible_by_d = [[] for _ in courses]
+        self.feasible_by_r = [[] for _ in rooms]
+        for d, r in feasible:
+            self.feasible_by_d[d].append(r)
+            self.feasible_by_r[r].append(d)
 
-        variables['y'] = LpVariable.dicts(
-            "distance",
-            (d for d in range(len(self.courses))),
-            lowBound=0,
-            cat='Integer'
-        )
+        return feasible
 
-        variables['z'] = LpVariable.dicts(
-            "capacity_violation",
-            ((d, r) for d in range(len(self.courses)) for r in range(len(self.rooms))),
-            lowBound=0,
-            cat='Integer'
-        )
-
-        variables['w_lab'] = LpVariable.dicts(
-            "wrong_lab_usage",
-            (d for d in range(len(self.courses))),
-            cat='Binary'
-        )
+    def _order_courses_by_restrictiveness(self):
+        """
+        Put the courses with the fewest feasible rooms first in the model order
+        so the solver meets (and prunes on) the most constrained assignments
+        early. self.courses keeps the caller's order.
+        """
+        self._model_courses = list(self.courses)
+        self._calculate_feasible_pairs()
+        self._order = sorted(range(len(self.courses)), key=lambda d: len(self.feasible_by_d[d]))
+        self._model_courses = [self.courses[i] for i in self._order]
 
-        variables['w_sala'] = LpVariable.dicts(
-            "wrong_sala_usage",
-            (d for d in range(len(self.courses))),
-            cat='Binary'
-        )
+    def _create_decision_variables(self) -> Dict:
+        """Create and return all decision variables for the optimization model."""
+        variables = {}
+        feasible = self._calculate_feasible_pairs()
+        shape = (len(self._model_courses), len(self.rooms))
+
+        # Dense [d, r] arrays; pruned pairs are left as None. Indices are
+        # zero-padded so PuLP's name-sorted column order follows course order.
+        # z only exists where the class is larger than the room (elsewhere it
+        # would always be 0). It is continuous: it is minimized against integer
+        # bounds, so it is integral at the optimum without adding to the
+        # branching set.
+        d_width = len(str(max(shape[0] - 1, 0)))
+        r_width = len(str(max(shape[1] - 1, 0)))
+        cap_violation = self.cap_violation_const
+        x = np.empty(shape, dtype=object)
+        z = np.empty(shape, dtype=object)
+        for d, r in feasible:
+            suffix = f"{d:0{d_width}d}_{r:0{r_width}d}"
+            x[d, r] = LpVariable(f"assign_{suffix}", cat='Binary')
+            if cap_violation[d, r] > 0:
+                z[d, r] = LpVariable(f"capacity_violation_{suffix}", lowBound=0)
+
+        variables['x'] = x
+        variables['z'] = z
 
         return variables
 
@@ -236,104 +441,141 @@ class ScheduleOptimizer:
         """Create and return all constraints for the optimization model."""
         constraints = []
         x = self.variables['x']
-        w_lab = self.variables['w_lab']
-        w_sala = self.variables['w_sala']
-        y = self.variables['y']
         z = self.variables['z']
+        courses = self._model_courses
+        n_courses = len(courses)
+        feasible_by_d = self.feasible_by_d
+        feasible_by_r = self.feasible_by_r
 
         # Each course must be assigned to exactly one room
-        for d in range(len(self.courses)):
-            constraints.append(
-                lpSum(x[d,r] for r in range(len(self.rooms))) == 1
-            )
-
-        # Time slot conflicts
-        for r in range(len(self.rooms)):
-            for h in range(48):  # 48 time slots
-                constraints.append(
-                    lpSum(x[d,r] * self.courses[d].time_slots[h]
-                         for d in range(len(self.courses))) <= 1
-                )
-
-        # Room type constraints
-        lab_rooms = [r for r, room in enumerate(self.rooms) 
-                    if room.room_type == RoomType.LAB]
-
-        for d in range(len(self.courses)):
-            if self.courses[d].requires_lab:
-                constraints.append(
-                    w_lab[d] == 1 - lpSum(x[d,r] for r in lab_rooms)
-                )
-            else:
-                constraints.append(
-                    w_sala[d] == lpSum(x[d,r] for r in lab_rooms)
-                )
-
-        # Distance constraints
-        for d in range(len(self.courses)):
-            for r in range(len(self.rooms)):
-                constraints.append(
-                    y[d] >= x[d,r] * abs(self.courses[d].preferred_floor - 
-                                       self.rooms[r].floor)
-                )
-
-        # Capacity constraints
-        for d in range(len(self.courses)):
-            for r in range(len(self.rooms)):
-                constraints.append(
-                    z[d,r] >= x[d,r] * (self.courses[d].class_size - 
-                                       self.rooms[r].capacity)
-                )
-
-                # Prevent assignments that exceed capacity by more than 20%
-                constraints.append(
-                    self.courses[d].class_size <= 
-                    (self.rooms[r].capacity * 1.2 + (1 - x[d,r]) * 9999)
-                )
-
-        blocked_rooms = [r for r, room in enumerate(self.rooms) if room.is_blocked]
-        for r in blocked_rooms:
-            constraints.append(
-                lpSum(x[d,r] for d in range(len(self.courses))) == 0
-            )
+        for d in range(n_courses):
+            constraints.append(LpConstraint(
+                LpAffineExpression((x[d,r], 1) for r in feasible_by_d[d]),
+                LpConstraintEQ, rhs=1
+            ))
+
+        # Time slot conflicts (only courses that occupy slot h contribute)
+        courses_by_slot = [
+            slot_courses for slot_courses in TimeSlotManager.courses_by_slot(courses)
+            if len(slot_courses) > 1
+        ]
+        for r, room_courses in enumerate(feasible_by_r):
+            room_courses = set(room_courses)
+            for slot_courses in courses_by_slot:
+                competing = [d for d in slot_courses if d in room_courses]
+                # A single binary is already <= 1
+                if len(competing) > 1:
+                    constraints.append(LpConstraint(
+                        LpAffineExpression((x[d,r], 1) for d in competing),
+                        LpConstraintLE, rhs=1
+                    ))
+
+        # Capacity constraints (pairs beyond 120% of capacity were pruned,
+        # and pairs where the class fits the room have no z)
+        cap_violation = self.cap_violation_const.tolist()
+        for d in range(n_courses):
+            violation = cap_violation[d]
+            for r in feasible_by_d[d]:
+                if violation[r]:
+                    constraints.append(LpConstraint(
+                        LpAffineExpression([(z[d,r], 1), (x[d,r], -violation[r])]),
+                        LpConstraintGE, rhs=0
+                    ))
 
         return constraints
 
     def _create_objective_function(self) -> LpAffineExpression:
         """Create and return the objective function for the optimization model."""
         x = self.variables['x']
-        w_lab = self.variables['w_lab']
-        w_sala = self.variables['w_sala']
-        y = self.variables['y']
         z = self.variables['z']
-
-        return (
-            self.weights['floor_pref'] * lpSum(
-                x[d,r] * self.courses[d].floor_preference_weight *
-                (1 - self.rooms[r].floor_matches[self.courses[d].name])
-                for d in range(len(self.courses))
-                for r in range(len(self.rooms))
-            ) +
-            self.weights['lab_usage'] * lpSum(w_sala[d] 
-                                            for d in range(len(self.courses))) +
-            self.weights['wrong_room'] * lpSum(w_lab[d] 
-                                             for d in range(len(self.courses))) +
-            self.weights['distance'] * lpSum(y[d] 
-                                           for d in range(len(self.courses))) +
-            self.weights['capacity_penalty'] * lpSum(z[d,r]
-                for d in range(len(self.courses))
-                for r in range(len(self.rooms)))
-        )
+        courses = self._model_courses
+        rooms = self.rooms
+        n_courses = len(courses)
+        feasible_by_d = self.feasible_by_d
+
+        # All coefficients are integers so the solver gets a pure integer
+        # program (and a shorter model file)
+        self._check_weights(self.weights)
+        floor_pref = int(self.weights['floor_pref'])
+        lab_usage = int(self.weights['lab_usage'])
+        wrong_room = int(self.weights['wrong_room'])
+        distance = int(self.weights['distance'])
+        capacity_penalty = int(self.weights['capacity_penalty'])
+
+        floor_match = self.floor_match.tolist()
+        floor_dist = self.floor_dist.tolist()
+        is_lab = [room.room_type == RoomType.LAB for room in rooms]
+
+        terms = []
+        for d in range(n_courses):
+            course = courses[d]
+            # Per-course floor weights are rounded half up to the nearest integer
+            floor_weight = math.floor(floor_pref * course.floor_preference_weight + 0.5)
+            match = floor_match[d]
+            dist = floor_dist[d]
+            for r in feasible_by_d[d]:
+                # Each course sits in exactly one room, so per-course penalties
+                # (floor distance, wrong room type) are plain x coefficients
+                # and need no auxiliary variables
+                coeff = floor_weight * (1 - match[r]) + distance * dist[r]
+                if course.requires_lab and not is_lab[r]:
+                    coeff += wrong_room
+                elif not course.requires_lab and is_lab[r]:
+                    coeff += lab_usage
+                if coeff:
+                    terms.append((x[d,r], coeff))
+                if z[d,r] is not None:
+                    terms.append((z[d,r], capacity_penalty))
+
+        return LpAffineExpression(terms)
+
+    def _set_greedy_start(self):
+        """
+        Seed the variables with a greedy assignment used as the solver's warm
+        start: largest classes first, each into a free feasible room, preferring
+        the right room type, then the closest floor, then the least overcrowding.
+        """
+        x = self.variables['x']
+        z = self.variables['z']
+        courses = self._model_courses
+        is_lab = [room.room_type == RoomType.LAB for room in self.rooms]
+        floor_dist = self.floor_dist.tolist()
+        cap_violation = self.cap_violation_const.tolist()
+        room_slots = [0] * len(self.rooms)
+
+        for d, rooms in enumerate(self.feasible_by_d):
+            for r in rooms:
+                x[d,r].setInitialValue(0)
+                if z[d,r] is not None:
+                    z[d,r].setInitialValue(0)
+
+        for d in sorted(range(len(courses)), key=lambda d: -courses[d].class_size):
+            course = courses[d]
+            free_rooms = [
+                r for r in self.feasible_by_d[d]
+                if not TimeSlotManager.has_conflict(room_slots[r], course.time_slots)
+            ]
+            if not free_rooms:
+                continue
+
+            r = min(free_rooms, key=lambda r: (
+                is_lab[r] != course.requires_lab, floor_dist[d][r], cap_violation[d][r]
+            ))
+            room_slots[r] |= course.time_slots
+            x[d,r].setInitialValue(1)
+            if z[d,r] is not None:
+                z[d,r].setInitialValue(cap_violation[d][r])
 
     def _format_results(self) -> pd.DataFrame:
         """Format optimization results into a pandas DataFrame."""
         results = []
         x = self.variables['x']
 
-        for d in range(len(self.courses)):
-            for r in range(len(self.rooms)):
-                if value(x[d,r]) == 1:
-                    course = self.courses[d]
+        # Report courses in the caller's order, not the model's
+        for d in sorted(range(len(self._model_courses)), key=self._order.__getitem__):
+            for r in self.feasible_by_d[d]:
+                if value(x[d,r]) > 0.5:
+                    course = self._model_courses[d]
                     room = self.rooms[r]
 
                     results.append({
@@ -345,7 +587,7 @@ class ScheduleOptimizer:
                         'Andar': room.floor,
                         'Tipo Sala': room.room_type.value.upper(),
                         'Andar Preferido': course.preferred_floor,
-                        'Floor Match': room.floor_matches[course.name],
+                        'Floor Match': int(self.floor_match[d, r]),
                         'Tamanho Turma': course.class_size,
                         'Capacidade Sala': room.capacity,
                         'Ocupação (%)': round(course.class_size / room.capacity * 100, 1),
@@ -356,6 +598,17 @@ class ScheduleOptimizer:
 
         return pd.DataFrame(results)
 
+def _optimize_scenario(courses: List[Course], rooms: List[Room], weights: Dict[str, int],
+                       solver: Optional[LpSolver], time_limit: Optional[float],
+                       gap_rel: Optional[float]) -> pd.DataFrame:
+    """Worker for ScheduleOptimizer.optimize_many; runs in its own process."""
+    if solver is None:
+        solver = ScheduleOptimizer._default_solver(time_limit, gap_rel, threads=1)
+
+    optimizer = ScheduleOptimizer(courses, rooms, solver=solver)
+    optimizer.weights.update(weights)
+    return optimizer.optimize()
+
 class ScheduleAnalyzer:
     @staticmethod
     def analyze_schedule(schedule_df: pd.DataFrame, rooms: List[Room], courses: List[Course]):
@@ -380,84 +633,82 @@ class ScheduleAnalyzer:
         split_classes = []
         original_courses = {course.course_code.split('-')[0]: course for course in courses}
 
-        for course_code in schedule_df['Curso'].unique():
-            base_code = course_code.split('-')[0]
-            if '-A' in course_code or '-B' in course_code:
-                original_course = original_courses.get(base_code)
-                if original_course:
-                    split_classes.append({
-                        'original_course': base_code,
-                        'original_size': original_course.class_size,
-                        'split_sections': schedule_df[schedule_df['Curso'].str.startswith(base_code)][
-                            ['Curso', 'Sala', 'Tamanho Turma', 'Horário']
-                        ].to_dict('records')
-                    })
+        split_df = schedule_df[schedule_df['Curso'].str.contains(r'-[AB]$', regex=True)]
+        base_codes = split_df['Curso'].str.split('-', n=1).str[0]
+
+        for base_code, group in split_df.groupby(base_codes):
+            original_course = original_courses.get(base_code)
+            if original_course:
+                split_classes.append({
+                    'original_course': base_code,
+                    'original_size': original_course.class_size,
+                    'split_sections': group[
+                        ['Curso', 'Sala', 'Tamanho Turma', 'Horário']
+                    ].to_dict('records')
+                })
 
         return split_classes
 
     @staticmethod
     def _check_time_conflicts(schedule_df: pd.DataFrame) -> List[Dict]:
-        conflicts = []
-        for (sala, dia, horario), group in schedule_df.groupby(['Sala', 'Dia', 'Horário']):
-            if len(group) > 1:
-                conflicts.append({
-                    'sala': sala,
-                    'dia': dia,
-                    'horario': horario,
-                    'disciplinas': group['Disciplina'].tolist()
-                })
-        return conflicts
+        keys = ['Sala', 'Dia', 'Horário']
+        duplicated = schedule_df[schedule_df.duplicated(subset=keys, keep=False)]
+
+        return duplicated.groupby(keys)['Disciplina'].agg(list).reset_index().rename(columns={
+            'Sala': 'sala',
+            'Dia': 'dia',
+            'Horário': 'horario',
+            'Disciplina': 'disciplinas'
+        }).to_dict('records')
 
     @staticmethod
     def _check_capacity_issues(schedule_df: pd.DataFrame) -> List[Dict]:
-        capacity_issues = []
         over_capacity = schedule_df[schedule_df['Tamanho Turma'] > schedule_df['Capacidade Sala']]
 
-        for _, row in over_capacity.iterrows():
-            capacity_issues.append({
-                'disciplina': row['Disciplina'],
-                'sala': row['Sala'],
-                'tamanho_turma': row['Tamanho Turma'],
-                'capacidade_sala': row['Capacidade Sala'],
-                'ocupacao': row['Ocupação (%)']
-            })
-        return capacity_issues
+        return over_capacity[
+            ['Disciplina', 'Sala', 'Tamanho Turma', 'Capacidade Sala', 'Ocupação (%)']
+        ].rename(columns={
+            'Disciplina': 'disciplina',
+            'Sala': 'sala',
+            'Tamanho Turma': 'tamanho_turma',
+            'Capacidade Sala': 'capacidade_sala',
+            'Ocupação (%)': 'ocupacao'
+        }).to_dict('records')
 
     @staticmethod
     def _check_room_type_mismatches(schedule_df: pd.DataFrame) -> List[Dict]:
-        mismatches = []
         incorrect_assignments = schedule_df[schedule_df['Mismatch']]
 
-        for _, row in incorrect_assignments.iterrows():
-            tipo_necessario = "laboratório" if row['Requer Lab'] else "sala regular"
-            tipo_alocado = "laboratório" if row['Tipo Sala'] == 'LAB' else "sala regular"
-
-            mismatches.append({
-                'disciplina': row['Disciplina'],
-                'curso': row['Curso'],
-                'sala': row['Sala'],
-                'tipo_necessario': tipo_necessario,
-                'tipo_alocado': tipo_alocado,
-                'dia': row['Dia'],
-                'horario': row['Horário']
-            })
-        return mismatches
+        mismatches = incorrect_assignments[
+            ['Disciplina', 'Curso', 'Sala', 'Requer Lab', 'Tipo Sala', 'Dia', 'Horário']
+        ].rename(columns={
+            'Disciplina': 'disciplina',
+            'Curso': 'curso',
+            'Sala': 'sala',
+            'Requer Lab': 'tipo_necessario',
+            'Tipo Sala': 'tipo_alocado',
+            'Dia': 'dia',
+            'Horário': 'horario'
+        })
+        mismatches['tipo_necessario'] = np.where(
+            incorrect_assignments['Requer Lab'], "laboratório", "sala regular"
+        )
+        mismatches['tipo_alocado'] = np.where(
+            incorrect_assignments['Tipo Sala'] == 'LAB', "laboratório", "sala regular"
+        )
+        return mismatches.to_dict('records')
 
     @staticmethod
     def _check_blocked_room_usage(schedule_df: pd.DataFrame, rooms: List[Room]) -> List[Dict]:
-        blocked_rooms = {room.name: room.is_blocked for room in rooms}
-        blocked_usage = []
-
-        for _, row in schedule_df.iterrows():
-            if blocked_rooms.get(row['Sala'], False):
-                blocked_usage.append({
-                    'disciplina': row['Disciplina'],
-                    'sala': row['Sala'],
-                    'dia': row['Dia'],
-                    'horario': row['Horário']
-                })
-
-        return blocked_usage
+        blocked_rooms = {room.name for room in rooms if room.is_blocked}
+        blocked_usage = schedule_df[schedule_df['Sala'].isin(blocked_rooms)]
+
+        return blocked_usage[['Disciplina', 'Sala', 'Dia', 'Horário']].rename(columns={
+            'Disciplina': 'disciplina',
+            'Sala': 'sala',
+            'Dia': 'dia',
+            'Horário': 'horario'
+        }).to_dict('records')
 
 def main():
     COURSES_FILE = "./courses_data.csv"